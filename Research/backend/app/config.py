@@ -31,18 +31,40 @@ API_KEY = os.getenv("API_KEY")
 if not API_KEY:
     raise RuntimeError("❌ API_KEY not found in .env! Backend cannot start.")
 
+# Separate credential for /admin/* endpoints (e.g. the profiler). Unset →
+# admin endpoints are disabled; the shared API_KEY never grants admin.
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
 FERNET_KEY = os.getenv("FERNET_KEY")
 if not FERNET_KEY:
     raise RuntimeError("❌ FERNET_KEY missing in .env! Generate a key first.")
 
+# Cipher used for new ciphertexts: "fernet" (default), "aesgcm" or "chacha20",
+# or a specific AEAD key id from crypto_utils.AEAD_CIPHERS (e.g. "a2").
+# Values written by any of them stay readable whichever one is selected.
+# Switching away from fernet is a one-way migration: code from before the
+# AEAD backends cannot read the "<key_id>:..." values, so a rollback past
+# it would break every email/secret written in the meantime.
+CIPHER_BACKEND = os.getenv("CIPHER_BACKEND", "fernet")
+
 RATE_LIMIT_REQUESTS = int(os.getenv("RATE_LIMIT_REQUESTS", "30"))
 RATE_LIMIT_PERIOD = int(os.getenv("RATE_LIMIT_PERIOD", "60"))
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+# Adds a Server-Timing header (db / crypto / jwt / encode) to every response.
+# Off by default: it exposes internal timings to every client, including
+# unauthenticated ones, so enable it only while diagnosing.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8000"))
 
+# Multi-worker mode (python -m app.serve). Cross-worker state lives in a
+# local SQLite file shared by all workers on the machine.
+WORKERS = int(os.getenv("WORKERS", "1"))
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "./state.db")
+
 # -------------------------------------------------------------------
 # Debug print (optional – remove in production)
 # -------------------------------------------------------------------
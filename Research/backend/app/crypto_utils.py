@@ -1,4 +1,13 @@
+import base64
+import os
+
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from .config import CIPHER_BACKEND
+from .profiling import stage
 
 # Generate or load a key
 def load_key():
@@ -16,11 +25,108 @@ key = load_key()
 fernet = Fernet(key)
 
 
+# -------------------------------------------------------------------
+# Ciphertext format
+#
+#   <key_id>:<urlsafe-base64(nonce || ciphertext || tag)>   AEAD backends
+#   <fernet token>                                          legacy Fernet
+#
+# Fernet tokens are pure urlsafe-base64 and never contain ':', so a
+# value without a key-id prefix is always a legacy Fernet token.
+# -------------------------------------------------------------------
+KEY_ID_SEPARATOR = ":"
+
+
+def derive_key(info: bytes) -> bytes:
+    """Derive a 256-bit AEAD key from the master key in secret.key."""
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=info)
+    return hkdf.derive(base64.urlsafe_b64decode(key))
+
+
+class FernetCipher:
+    """Legacy AES-128-CBC + HMAC-SHA256 cipher (unprefixed tokens)."""
+
+    key_id = None
+
+    def __init__(self, fernet: Fernet):
+        self._fernet = fernet
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._fernet.encrypt(data)
+
+    def decrypt(self, token: bytes) -> bytes:
+        return self._fernet.decrypt(token)
+
+
+class AEADCipher:
+    """
+    AES-GCM / ChaCha20-Poly1305 cipher working directly on bytes.
+
+    encrypt() returns nonce || ciphertext || tag in a single buffer, so
+    there is no separate MAC pass and no base64 inside the cipher itself.
+    """
+
+    NONCE_SIZE = 12
+
+    def __init__(self, key_id: str, aead):
+        self.key_id = key_id
+        self._aead = aead
+
+    def encrypt(self, data: bytes) -> bytes:
+        nonce = os.urandom(self.NONCE_SIZE)
+        return nonce + self._aead.encrypt(nonce, data, None)
+
+    def decrypt(self, blob: bytes) -> bytes:
+        return self._aead.decrypt(blob[:self.NONCE_SIZE], blob[self.NONCE_SIZE:], None)
+
+
+fernet_cipher = FernetCipher(fernet)
+
+# Every AEAD key this process can decrypt with, by key id. To rotate,
+# add a new id (e.g. "a2" from info b"aesgcm:2") and set CIPHER_BACKEND
+# to that key id; values under older ids stay readable.
+AEAD_CIPHERS = {
+    "a1": AEADCipher("a1", AESGCM(derive_key(b"aesgcm:1"))),
+    "c1": AEADCipher("c1", ChaCha20Poly1305(derive_key(b"chacha20poly1305:1"))),
+}
+
+CIPHER_BACKENDS = {
+    "fernet": fernet_cipher,
+    "aesgcm": AEAD_CIPHERS["a1"],
+    "chacha20": AEAD_CIPHERS["c1"],
+}
+
+# CIPHER_BACKEND is either a backend name or a specific AEAD key id
+cipher = CIPHER_BACKENDS.get(CIPHER_BACKEND) or AEAD_CIPHERS.get(CIPHER_BACKEND)
+if cipher is None:
+    raise RuntimeError(
+        f"❌ Unknown CIPHER_BACKEND '{CIPHER_BACKEND}'. "
+        f"Choose one of: {', '.join([*CIPHER_BACKENDS, *AEAD_CIPHERS])}"
+    )
+
+
+def encrypt_with(active_cipher, plaintext: str) -> str:
+    """Encrypt plaintext with a specific cipher and tag it with its key id."""
+    blob = active_cipher.encrypt(plaintext.encode())
+    if active_cipher.key_id is None:
+        return blob.decode()
+    return active_cipher.key_id + KEY_ID_SEPARATOR + base64.urlsafe_b64encode(blob).decode()
+
+
 def encrypt_text(plaintext: str) -> str:
-    """Encrypt a plaintext string using Fernet."""
-    return fernet.encrypt(plaintext.encode()).decode()
+    """Encrypt a plaintext string using the configured cipher."""
+    with stage("crypto"):
+        return encrypt_with(cipher, plaintext)
 
 
 def decrypt_text(ciphertext: str) -> str:
-    """Decrypt ciphertext string using Fernet."""
-    return fernet.decrypt(ciphertext.encode()).decode()
+    """Decrypt ciphertext string, picking the cipher from its key-id prefix."""
+    with stage("crypto"):
+        key_id, sep, body = ciphertext.partition(KEY_ID_SEPARATOR)
+        if not sep:
+            return fernet_cipher.decrypt(ciphertext.encode()).decode()
+
+        aead = AEAD_CIPHERS.get(key_id)
+        if aead is None:
+            raise ValueError(f"Unknown cipher key id '{key_id}'")
+        return aead.decrypt(base64.urlsafe_b64decode(body)).decode()
@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import DATABASE_URL
+from .shared_state import shared_store
 
 
 # sqlite specific connect args (safe for local exam usage)
@@ -8,3 +9,19 @@ connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite")
 engine = create_engine(DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+
+def init_db():
+    """Create all tables. Safe to call repeatedly, but not concurrently."""
+    from . import models  # noqa: F401  registers the tables on Base
+    Base.metadata.create_all(bind=engine)
+
+
+def prefork_setup():
+    """
+    One-time schema and shared-state setup. app.serve runs it in the
+    parent before starting workers; a single-process app.main runs it
+    at import.
+    """
+    init_db()
+    shared_store.init()
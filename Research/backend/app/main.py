@@ -1,30 +1,52 @@
-from fastapi import FastAPI, Depends, Request, HTTPException, Header
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Depends, Request, HTTPException, Header, Query
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime
 import time
 import logging
+import os
 
-from .db import Base, engine, SessionLocal
+from .db import engine, SessionLocal, prefork_setup
 from .models import User, APIAuditLog, APIUsageAnalytics
-from .schemas import UserCreate
+from .schemas import UserCreate, SecretBatchRequest
 from .crypto_utils import encrypt_text, decrypt_text
-from .config import RATE_LIMIT_PERIOD, RATE_LIMIT_REQUESTS, LOG_LEVEL
-from .security import require_api_key, require_zero_trust, ZeroTrustGateway
+from .config import (
+    RATE_LIMIT_PERIOD, RATE_LIMIT_REQUESTS, LOG_LEVEL, SERVER_TIMING
+)
+from .security import require_api_key, require_admin_key, require_zero_trust, ZeroTrustGateway
 from .secrets_manager import SecretsManager
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from .versioning import (
+    change_versions, etag_matches, not_modified,
+    USERS, secret_resource,
+)
+from .profiling import (
+    TimedJSONResponse, ServerTimingMiddleware, instrument_engine, profiler,
+)
+
+# Create database tables + shared state. Under `python -m app.serve` this
+# already ran once before the workers were started. Read the flag from the
+# environment here, not from config: with --workers 1 uvicorn imports this
+# module in the serve process itself, after config was already loaded.
+if os.environ.get("PREFORK_SETUP_DONE") != "1":
+    prefork_setup()
+instrument_engine(engine)
 
 zero_trust = ZeroTrustGateway()
 
-app = FastAPI()
+app = FastAPI(default_response_class=TimedJSONResponse)
 
 logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger("secure-backend")
 
 
+# -----------------------------------------------------
+# SERVER-TIMING
+# -----------------------------------------------------
+if SERVER_TIMING:
+    app.add_middleware(ServerTimingMiddleware)
+
+
 # -----------------------------------------------------
 # DATABASE SESSION
 # -----------------------------------------------------
@@ -84,6 +106,7 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db), request: Req
     db.add(user)
     db.commit()
     db.refresh(user)
+    change_versions.bump(USERS)
 
     logger.info("user created id=%s by=%s", user.id, client_id_from_request(request))
     return {"message": "User saved successfully!", "user": user.as_dict(decrypt_fn=decrypt_text)}
@@ -91,18 +114,35 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db), request: Req
 
 @app.get("/users", dependencies=[Depends(require_api_key)])
 def get_users(db: Session = Depends(get_db), request: Request = None):
+    etag = change_versions.etag(USERS)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     users = db.query(User).all()
-    return [u.as_dict(decrypt_fn=decrypt_text) for u in users]
+    return TimedJSONResponse(
+        content=[u.as_dict(decrypt_fn=decrypt_text) for u in users],
+        headers={"ETag": etag}
+    )
 
 
 # -----------------------------------------------------
 # ANALYTICS
 # -----------------------------------------------------
 @app.get("/analytics/overview", dependencies=[Depends(require_api_key)])
-def get_analytics_overview(db: Session = Depends(get_db)):
+def get_analytics_overview(db: Session = Depends(get_db), request: Request = None):
 
     today = datetime.utcnow().strftime('%Y-%m-%d')
 
+    # Audit rows are written outside this app, so there is no counter to
+    # bump; fingerprint the table instead (one cheap query that skips the
+    # aggregates below). "total_requests" is per-day, so the date goes in too.
+    max_id, row_count = db.query(
+        func.max(APIAuditLog.id), func.count(APIAuditLog.id)
+    ).one()
+    etag = f'"{today}-{max_id or 0}-{row_count}"'
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     total_today = db.query(APIAuditLog).filter(
         APIAuditLog.timestamp >= datetime.utcnow().date()
     ).count()
@@ -114,12 +154,15 @@ def get_analytics_overview(db: Session = Depends(get_db)):
         func.count(APIAuditLog.id)
     ).group_by(APIAuditLog.endpoint).limit(5).all()
 
-    return {
-        "date": today,
-        "total_requests": total_today,
-        "avg_response_time_ms": round(avg_response, 2),
-        "top_endpoints": [{"endpoint": e, "count": c} for e, c in top_endpoints]
-    }
+    return TimedJSONResponse(
+        content={
+            "date": today,
+            "total_requests": total_today,
+            "avg_response_time_ms": round(avg_response, 2),
+            "top_endpoints": [{"endpoint": e, "count": c} for e, c in top_endpoints]
+        },
+        headers={"ETag": etag}
+    )
 
 
 @app.get("/analytics/logs", dependencies=[Depends(require_api_key)])
@@ -131,6 +174,9 @@ def get_audit_logs(db: Session = Depends(get_db), limit: int = 100):
 # -----------------------------------------------------
 # SECRETS MANAGEMENT
 # -----------------------------------------------------
+SECRETS_BATCH_LIMIT = 200
+
+
 @app.post("/secrets", dependencies=[Depends(require_zero_trust)])
 def create_secret(
     name: str, value: str, description: str = "",
@@ -146,12 +192,72 @@ def create_secret(
 
 
 @app.get("/secrets/{name}", dependencies=[Depends(require_zero_trust)])
-def get_secret(name: str, db: Session = Depends(get_db), payload: dict = Depends(require_zero_trust)):
+def get_secret(name: str, request: Request, db: Session = Depends(get_db), payload: dict = Depends(require_zero_trust)):
+    etag = change_versions.etag(secret_resource(name))
+
+    # Only create/rotate bump a secret's version and there is no delete, so
+    # a version > 0 proves the secret exists and the 304 can skip the query.
+    if change_versions.get(secret_resource(name)) and etag_matches(request, etag):
+        return not_modified(etag)
+
+    manager = SecretsManager(db)
+    secret = manager.get_secret(name)
+    if secret is None:
+        # No representation, so no ETag for clients to revalidate against
+        return TimedJSONResponse(content=None)
+
+    # Version 0 but present (created before counters were tracked)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return TimedJSONResponse(content=secret, headers={"ETag": etag})
+
+
+@app.post("/secrets/batch", dependencies=[Depends(require_zero_trust)])
+def get_secrets_batch(
+    batch: SecretBatchRequest,
+    db: Session = Depends(get_db),
+    payload: dict = Depends(require_zero_trust)
+):
+    if not batch.names and not batch.prefix:
+        raise HTTPException(status_code=400, detail="Provide 'names' and/or 'prefix'")
+    if len(batch.names) > SECRETS_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {SECRETS_BATCH_LIMIT} names per batch"
+        )
+
     manager = SecretsManager(db)
-    return manager.get_secret(name)
+    try:
+        return manager.get_secrets(batch.names, batch.prefix, limit=SECRETS_BATCH_LIMIT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.post("/secrets/{name}/rotate", dependencies=[Depends(require_zero_trust)])
 def rotate_secret(name: str, new_value: str, db: Session = Depends(get_db), payload: dict = Depends(require_zero_trust)):
     manager = SecretsManager(db)
     return manager.rotate_secret(name, new_value)
+
+
+# -----------------------------------------------------
+# PROFILING
+# -----------------------------------------------------
+@app.post("/admin/profile", dependencies=[Depends(require_admin_key)])
+def capture_profile(
+    seconds: float = Query(10, gt=0, le=profiler.MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000)
+):
+    """
+    Sample live traffic for `seconds` and return collapsed stacks,
+    e.g. `flamegraph.pl profile.collapsed > profile.svg`.
+    """
+    try:
+        stacks = profiler.capture(seconds, interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    logger.info("profile captured seconds=%s interval_ms=%s", seconds, interval_ms)
+    return PlainTextResponse(
+        stacks,
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'}
+    )
@@ -0,0 +1,188 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+
+
+# =====================================================================
+# 1. PER-REQUEST STAGE TIMERS  (reported as a Server-Timing header)
+# =====================================================================
+
+# Holds a {stage: [total_ms, calls]} dict for the request being served.
+# The dict is created by ServerTimingMiddleware and only mutated afterwards, so
+# threadpool workers running sync endpoints (which get a copy of the
+# context) still write into the same object.
+_request_timings: ContextVar = ContextVar("request_timings", default=None)
+
+
+def start_request_timing():
+    timings = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def record_stage(name: str, elapsed_ms: float):
+    timings = _request_timings.get()
+    if timings is None:
+        return
+    entry = timings.setdefault(name, [0.0, 0])
+    entry[0] += elapsed_ms
+    entry[1] += 1
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block and add it to the current request's stage totals."""
+    if _request_timings.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, (time.perf_counter() - start) * 1000)
+
+
+def server_timing_header(timings: dict, total_ms: float) -> str:
+    parts = [
+        f'{name};dur={ms:.2f};desc="{calls} call(s)"'
+        for name, (ms, calls) in timings.items()
+    ]
+    parts.append(f"app;dur={total_ms:.2f}")
+    return ", ".join(parts)
+
+
+def instrument_engine(engine):
+    """Attribute every SQL statement run on engine to the "db" stage."""
+
+    # The start time lives on the per-statement execution context, so a
+    # statement that raises (no after_cursor_execute) leaves nothing behind
+    # on the pooled connection.
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_start", None)
+        if start is not None:
+            record_stage("db", (time.perf_counter() - start) * 1000)
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware: gives each HTTP request a stage table and adds
+    the totals as a Server-Timing header on the response start message.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request_timing()
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start) * 1000
+                header = server_timing_header(timings, total_ms)
+                message = dict(message)
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", header.encode("latin-1")),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse whose serialization is reported as the "encode" stage."""
+
+    def render(self, content) -> bytes:
+        with stage("encode"):
+            return super().render(content)
+
+
+# =====================================================================
+# 2. ON-DEMAND SAMPLING PROFILER  (collapsed-stack output)
+# =====================================================================
+class SamplingProfiler:
+    """
+    Samples the stacks of every busy thread for a fixed duration and
+    folds them into Brendan Gregg's collapsed format:
+
+        frame;frame;frame <count>
+
+    which flamegraph.pl, speedscope and inferno all read directly.
+    Runs inside the serving process, so no restart is needed.
+    """
+
+    MAX_SECONDS = 60
+
+    # Top frames of threads parked with nothing to do: threadpool/anyio
+    # workers waiting for a job and the event loop waiting on its selector.
+    # Sampling these would bury the request stacks under idle waits.
+    IDLE_FRAMES = {
+        ("threading.py", "wait"),
+        ("threading.py", "_wait_for_tstate_lock"),
+        ("queue.py", "get"),
+        ("selectors.py", "select"),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def capture(self, seconds: float, interval_ms: float = 5) -> str:
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already being captured")
+        try:
+            return self._sample(min(seconds, self.MAX_SECONDS), interval_ms / 1000)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval: float) -> str:
+        own_ident = threading.get_ident()
+        stacks = Counter()
+        deadline = time.perf_counter() + seconds
+
+        while time.perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident or self._is_idle(frame):
+                    continue
+                stacks[self._collapse(names.get(ident, str(ident)), frame)] += 1
+            time.sleep(interval)
+
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    @classmethod
+    def _is_idle(cls, frame) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in cls.IDLE_FRAMES
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        frames.reverse()
+        # ';' separates frames in the collapsed format
+        return ";".join(f.replace(";", ":") for f in frames)
+
+
+profiler = SamplingProfiler()
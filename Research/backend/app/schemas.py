@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from pydantic import BaseModel, Field, EmailStr
 
 
@@ -16,3 +18,8 @@ class UserOut(BaseModel):
 
 	class Config:
 		orm_mode = True
+
+
+class SecretBatchRequest(BaseModel):
+	names: List[str] = []
+	prefix: Optional[str] = None
@@ -1,7 +1,9 @@
 from .crypto_utils import encrypt_text, decrypt_text
 from .security import require_zero_trust
 from .models import Secret
+from .versioning import change_versions, secret_resource
 from datetime import datetime
+from sqlalchemy import func, or_
 
 class SecretsManager:
     def __init__(self, db):
@@ -27,6 +29,7 @@ class SecretsManager:
         self.db.add(secret)
         self.db.commit()
         self.db.refresh(secret)
+        change_versions.bump(secret_resource(name))
         
         return secret
     
@@ -47,6 +50,49 @@ class SecretsManager:
         
         return secret.as_dict()
     
+    def get_secrets(self, names: list = None, prefix: str = None, limit: int = 200):
+        """
+        Fetch many secrets in one query: every name in `names` plus every
+        secret whose name starts with `prefix`. Failures are reported per
+        name instead of failing the whole batch. More than `limit` matching
+        rows is rejected before anything is decrypted.
+        """
+        names = list(dict.fromkeys(names or []))
+        conditions = []
+        if names:
+            conditions.append(Secret.name.in_(names))
+        if prefix:
+            # Not LIKE: it is case-insensitive on SQLite, so "App" would
+            # also pull in the "app..." namespace. substr() compares exactly.
+            conditions.append(func.substr(Secret.name, 1, len(prefix)) == prefix)
+
+        if not conditions:
+            return {"secrets": {}, "errors": {}}
+
+        rows = self.db.query(Secret).filter(or_(*conditions)).limit(limit + 1).all()
+        if len(rows) > limit:
+            raise ValueError(f"Batch matches more than {limit} secrets; narrow the prefix")
+
+        secrets, errors = {}, {}
+        for secret in rows:
+            try:
+                value = decrypt_text(secret.encrypted_value)
+            except Exception:
+                errors[secret.name] = "Decryption failed"
+                continue
+            secrets[secret.name] = {
+                "id": secret.id,
+                "name": secret.name,
+                "value": value,
+                "description": secret.description
+            }
+
+        for name in names:
+            if name not in secrets and name not in errors:
+                errors[name] = "Secret not found"
+
+        return {"secrets": secrets, "errors": errors}
+    
     def rotate_secret(self, name: str, new_value: str):
         """Rotate/update secret value"""
         secret = self.db.query(Secret).filter(Secret.name == name).first()
@@ -58,4 +104,5 @@ class SecretsManager:
         secret.updated_at = datetime.utcnow()
         
         self.db.commit()
+        change_versions.bump(secret_resource(name))
         return secret
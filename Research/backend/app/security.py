@@ -2,10 +2,12 @@
 
 from fastapi import Header, HTTPException, status
 from datetime import datetime, timedelta
+import hmac
 import jwt
 
 # Load keys from config
-from .config import API_KEY, FERNET_KEY
+from .config import API_KEY, ADMIN_API_KEY, FERNET_KEY
+from .profiling import stage
 
 
 # =====================================================================
@@ -27,14 +29,23 @@ def require_api_key(
     return True
 
 
+def require_admin_key(x_admin_key: str = Header(None)):
+    """
+    Validates the x_admin_key header against ADMIN_API_KEY.
+    Admin endpoints are disabled when ADMIN_API_KEY is not configured.
+    """
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+    return True
+
+
 # =====================================================================
 # 2. ZERO-TRUST GATEWAY (Cloudflare Access-style JWT System)
 # =====================================================================
 class ZeroTrustGateway:
-    def __init__(self):
-        # In real production → replace with Redis or database store
-        self.service_tokens = {}
-
     def generate_service_token(
         self,
         user_id: int,
@@ -58,9 +69,6 @@ class ZeroTrustGateway:
 
         token = jwt.encode(payload, FERNET_KEY, algorithm="HS256")
 
-        # Optional runtime tracking
-        self.service_tokens[token] = payload
-
         return token
 
     def verify_service_token(self, token: str, required_permission: str = None):
@@ -69,7 +77,8 @@ class ZeroTrustGateway:
         Optionally checks if a specific permission is included.
         """
         try:
-            payload = jwt.decode(token, FERNET_KEY, algorithms=["HS256"])
+            with stage("jwt"):
+                payload = jwt.decode(token, FERNET_KEY, algorithms=["HS256"])
 
             # Check permission if required
             if required_permission:
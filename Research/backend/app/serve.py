@@ -0,0 +1,40 @@
+"""
+Production entry point with optional multiple workers:
+
+    python -m app.serve --workers 4
+
+Schema and shared-state setup run once here, in the parent process,
+before uvicorn starts its workers. Each worker then imports app.main
+with PREFORK_SETUP_DONE=1 and skips it.
+"""
+import argparse
+import os
+
+from .config import HOST, PORT, WORKERS, LOG_LEVEL
+from .db import prefork_setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the secure backend")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    prefork_setup()
+    # Seen by app.main whether uvicorn imports it in this process
+    # (--workers 1) or in the worker processes it spawns
+    os.environ["PREFORK_SETUP_DONE"] = "1"
+
+    import uvicorn
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=LOG_LEVEL.lower()
+    )
+
+
+if __name__ == "__main__":
+    main()
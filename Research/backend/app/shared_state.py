@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import threading
+import time
+
+from .config import STATE_DB_PATH
+
+
+# =====================================================================
+# SHARED LOCAL STORE  (cross-worker state on one machine)
+# =====================================================================
+class SharedStore:
+    """
+    Small SQLite (WAL) file holding state every worker process must agree
+    on: change-version counters and the ETag epoch.
+
+    Each thread keeps its own connection; SQLite's file locking makes
+    increments atomic across processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Create the file owner-only; SQLite gives the -wal/-shm files
+            # the same permissions as the database file.
+            os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def init(self):
+        """Create tables and start a new ETag epoch. Run once, before forking."""
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS counters (
+                name  TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        self.set_meta("epoch", format(time.time_ns(), "x"))
+
+    # ---------------- counters ----------------
+    def get_counter(self, name: str) -> int:
+        row = self._conn().execute(
+            "SELECT value FROM counters WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, name: str) -> int:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                (name,)
+            )
+            value = conn.execute(
+                "SELECT value FROM counters WHERE name = ?", (name,)
+            ).fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    # ---------------- meta ----------------
+    def get_meta(self, key: str):
+        row = self._conn().execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+
+shared_store = SharedStore(STATE_DB_PATH)
@@ -0,0 +1,82 @@
+from fastapi import Request, Response
+
+from .shared_state import shared_store
+
+
+# -----------------------------------------------------
+# Resource keys
+# -----------------------------------------------------
+USERS = "users"
+
+
+def secret_resource(name: str) -> str:
+    return f"secret:{name}"
+
+
+# =====================================================================
+# CHANGE VERSION COUNTERS
+# =====================================================================
+class ChangeVersions:
+    """
+    Monotonic per-resource counters used to build strong ETags.
+
+    Writers call bump() *after* their commit, readers call etag() *before*
+    they query, so a reader can only ever pair new data with an old tag
+    (harmless re-download) and never old data with a new tag.
+
+    Counters live in the shared store so every worker hands out the same
+    tag for the same data.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._epoch = None
+
+    @property
+    def epoch(self) -> str:
+        # Renewed by SharedStore.init() on every (re)start, so tags issued
+        # before a restart never match tags issued after it.
+        if self._epoch is None:
+            self._epoch = self._store.get_meta("epoch")
+        return self._epoch
+
+    def get(self, resource: str) -> int:
+        return self._store.get_counter(resource)
+
+    def bump(self, resource: str) -> int:
+        return self._store.incr(resource)
+
+    def etag(self, resource: str, *extra) -> str:
+        # ETags are scoped to a URL, so the resource key itself (which may
+        # be a user-supplied secret name) is left out of the tag.
+        parts = [self.epoch, str(self.get(resource))]
+        parts.extend(str(e) for e in extra)
+        return '"' + "-".join(parts) + '"'
+
+
+change_versions = ChangeVersions(shared_store)
+
+
+# =====================================================================
+# CONDITIONAL GET HELPERS
+# =====================================================================
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches etag."""
+    header = request.headers.get("if-none-match")
+    # "*" is deliberately not supported: it may only match when a current
+    # representation exists, which callers can't know before they query.
+    if not header:
+        return False
+
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
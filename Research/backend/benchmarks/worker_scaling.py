@@ -0,0 +1,101 @@
+"""
+Throughput vs. worker count on one machine.
+
+Run from backend/:
+
+    python -m benchmarks.worker_scaling [--workers 1 2 4] [--seconds 10]
+
+For each worker count this starts `python -m app.serve --workers N` on a
+spare port, drives GET /users from several client processes over
+keep-alive connections, and prints requests/second.
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+from app.config import API_KEY
+
+
+PATH = "/users"
+
+
+def wait_until_ready(port: int, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", PATH, headers={"x-api-key": API_KEY})
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not come up")
+
+
+def client(port: int, seconds: float, results):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"x-api-key": API_KEY}
+    done = errors = 0
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        conn.request("GET", PATH, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        if response.status == 200:
+            done += 1
+        else:
+            errors += 1
+    results.put((done, errors))
+
+
+def run(workers: int, port: int, seconds: float, clients: int):
+    env = dict(os.environ, LOG_LEVEL="WARNING", SERVER_TIMING="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", str(workers),
+         "--host", "127.0.0.1", "--port", str(port)],
+        env=env
+    )
+    try:
+        wait_until_ready(port)
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=client, args=(port, seconds, results))
+            for _ in range(clients)
+        ]
+        for p in procs:
+            p.start()
+        totals = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    done = sum(t[0] for t in totals)
+    errors = sum(t[1] for t in totals)
+    return done / seconds, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"GET {PATH}, {args.clients} client processes, {args.seconds}s per run")
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'errors':>7}")
+    baseline = None
+    for workers in args.workers:
+        rps, errors = run(workers, args.port, args.seconds, args.clients)
+        baseline = baseline or rps
+        print(f"{workers:>8} {rps:>10.1f} {rps / baseline:>7.2f}x {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
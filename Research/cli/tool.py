@@ -28,6 +28,29 @@ class CloudflareCloneCLI:
         self.headers = {"x-api-key": API_KEY}
         if self.token:
             self.headers["token"] = self.token  # Send token in header for Zero Trust
+        self.etag_cache = {}  # url -> (etag, parsed JSON) for conditional GETs
+
+    def conditional_get(self, url: str):
+        """
+        GET with If-None-Match. Returns (ok, data): the parsed JSON body
+        (replayed from the cache on a 304) or the error text.
+        """
+        headers = dict(self.headers)
+        cached = self.etag_cache.get(url)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        response = requests.get(url, headers=headers)
+
+        if response.status_code == 304 and cached:
+            return True, cached[1]
+        if response.status_code != 200:
+            return False, response.text
+
+        data = response.json()
+        if response.headers.get("ETag"):
+            self.etag_cache[url] = (response.headers["ETag"], data)
+        return True, data
 
     # ===========================================================
     # LOGIN (ZERO TRUST)
@@ -98,16 +121,15 @@ class CloudflareCloneCLI:
 
     def view_users(self):
         print("\n=== Registered Users ===")
-        response = requests.get(f"{API_URL}/users", headers=self.headers)
-        if response.status_code == 200:
-            users = response.json()
+        ok, users = self.conditional_get(f"{API_URL}/users")
+        if ok:
             if not users:
                 print("No users found.")
                 return
             for u in users:
                 print(f"- ID: {u['id']}, Name: {u['name']}, Email: {u['email']}, Age: {u['age']}")
         else:
-            print("❌ Error:", response.text)
+            print("❌ Error:", users)
 
     def get_current_user(self):
         if not self.token:
@@ -124,9 +146,8 @@ class CloudflareCloneCLI:
     # ANALYTICS (DASHBOARD)
     # ===========================================================
     def analytics_dashboard(self):
-        response = requests.get(f"{API_URL}/analytics/overview", headers=self.headers)
-        if response.status_code == 200:
-            data = response.json()
+        ok, data = self.conditional_get(f"{API_URL}/analytics/overview")
+        if ok:
             print("\n📊 API Analytics Dashboard")
             print("=" * 40)
             print(f"📅 Date: {data.get('date')}")
@@ -147,7 +168,7 @@ class CloudflareCloneCLI:
             if view_logs.lower() == 'y':
                 self.view_audit_logs()
         else:
-            print("❌ Error:", response.text)
+            print("❌ Error:", data)
     def view_audit_logs(self, limit: int = 20):
         response = requests.get(f"{API_URL}/analytics/logs?limit={limit}", headers=self.headers)
         if response.status_code == 200:
@@ -190,15 +211,14 @@ class CloudflareCloneCLI:
 
             elif choice == "2":
                 name = input("Secret name: ")
-                response = requests.get(f"{API_URL}/secrets/{name}", headers=self.headers)
-                if response.status_code == 200:
-                    sec = response.json()
+                ok, sec = self.conditional_get(f"{API_URL}/secrets/{name}")
+                if ok:
                     print(f"\n🔐 Secret: {sec['name']}")
                     print(f"Value: {sec['value']}")
                     if sec.get('description'):
                         print(f"Description: {sec['description']}")
                 else:
-                    print("❌ Error:", response.text)
+                    print("❌ Error:", sec)
 
             elif choice == "3":
                 name = input("Secret name: ")